@@ -0,0 +1,61 @@
+"""Functions for computing word co-occurences within abstract texts."""
+
+import numpy as np
+
+###################################################################################################
+################################# LISC - COOCCUR - FUNCTIONS ######################################
+###################################################################################################
+
+def get_cooccur(corpus, word2id, window=5):
+    """Count co-occurences of words, within a window of each other, across a corpus.
+
+    Parameters
+    ----------
+    corpus : list of list of str
+        Words for each document, such as the words extracted from each article.
+    word2id : dict
+        Mapping of each word in the vocabulary to an index, from 0 to the number of words.
+    window : int, optional (default: 5)
+        Maximum distance between words, in the document, to count as co-occuring.
+
+    Returns
+    -------
+    cooccur : 2d array
+        Number of co-occurences of each pair of words, with shape (n_words, n_words).
+
+    Notes
+    -----
+    - Words not in the vocabulary are dropped before co-occurences are counted.
+    - Co-occurences are counted in both directions, so the output is symmetric.
+        A repeated word is counted once on the diagonal, for each pair of its occurences.
+    - Counting is vectorized: all pairs of word indices are collected for each
+        distance in the window, and then added into the output matrix in a single pass.
+    """
+
+    n_words = len(word2id)
+    cooccur = np.zeros([n_words, n_words], dtype=np.int32)
+
+    rows, cols = [], []
+    for doc in corpus:
+
+        # Skip documents without any words (such as articles with no abstract)
+        if not doc:
+            continue
+
+        # Convert document to word indices, dropping out of vocabulary words
+        inds = np.array([word2id[word] for word in doc if word in word2id], dtype=np.int64)
+
+        # Collect the pairs of words at each distance within the window
+        #   Pairs are added in both directions, except pairs of the same word, counted once
+        for dist in range(1, min(window, len(inds) - 1) + 1):
+            firsts, seconds = inds[:-dist], inds[dist:]
+            diff = firsts != seconds
+            rows.extend((firsts, seconds[diff]))
+            cols.extend((seconds, firsts[diff]))
+
+    # Tally all pairs directly into the co-occurence matrix
+    #   Unbuffered addition is used so that repeated pairs are each counted
+    if rows:
+        np.add.at(cooccur, (np.concatenate(rows), np.concatenate(cols)), 1)
+
+    return cooccur
@@ -1,9 +1,32 @@
 """Object to handle URL requests."""
 
 import time
+import asyncio
+from importlib.util import find_spec
+
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+# Request rate & concurrency limits: NCBI allows 3 requests per second, or 10 with an API key
 REST_TIME = 1/3
+MAX_CONCURRENT = 3
+REST_TIME_KEY = 1/10
+MAX_CONCURRENT_KEY = 10
+MAX_RETRIES = 3
+BACKOFF = 0.5
+TIMEOUT = 30
+CHUNK_SIZE = 2**16
+
+# Whether HTTP/2 can be used for asynchronous requests, which requires the optional 'h2' package
+HTTP2 = find_spec('h2') is not None
+
+# Response statuses to retry requests for: too many requests, and temporary server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Headers to send with all requests: ask for compressed responses, which are decoded on receipt
+HEADERS = {'Accept-Encoding' : 'gzip'}
 
 ##################################################################################
 ##################################################################################
@@ -23,10 +46,27 @@ class Requester(object):
         Time when request session ended.
     time_last_req : float
         Time at which last request was sent.
+    rest_time : float
+        Minimum time, in seconds, between sending requests.
+    max_concurrent : int
+        Maximum number of asynchronous requests in flight at once.
+    session : requests.Session() object
+        Session used for requests, which reuses connections across requests.
+    async_session : httpx.AsyncClient() object or None
+        Session used for asynchronous requests, if open. Uses HTTP/2, if 'h2' is installed,
+        so that concurrent requests are multiplexed over shared connections.
     """
 
-    def __init__(self):
-        """Initialize Requester object."""
+    def __init__(self, rest_time=REST_TIME, max_concurrent=MAX_CONCURRENT):
+        """Initialize Requester object.
+
+        Parameters
+        ----------
+        rest_time : float, optional
+            Minimum time, in seconds, between sending requests.
+        max_concurrent : int, optional
+            Maximum number of asynchronous requests in flight at once.
+        """
 
         self.is_active = False
         self.n_requests = int()
@@ -36,6 +76,15 @@ class Requester(object):
 
         self.time_last_req = float()
 
+        self.rest_time = rest_time
+        self.max_concurrent = max_concurrent
+
+        self.session = _make_session(max_concurrent)
+
+        self.async_session = None
+        self._semaphore = None
+        self._lock = None
+
 
     def check(self):
         """Print out basic check of requester object."""
@@ -53,8 +102,8 @@ class Requester(object):
         time_since_req = time.time() - self.time_last_req
 
         # If last request was too recent, pause
-        if time_since_req < REST_TIME:
-            self.wait(REST_TIME - time_since_req)
+        if time_since_req < self.rest_time:
+            self.wait(self.rest_time - time_since_req)
 
 
     @staticmethod
@@ -91,7 +140,7 @@ class Requester(object):
             self.open()
 
         # Get the requested URL
-        out = requests.get(url)
+        out = self.session.get(url, timeout=TIMEOUT)
 
         # Update data on requests
         self.time_last_req = time.time()
@@ -100,6 +149,190 @@ class Requester(object):
         return out
 
 
+    async def open_session(self):
+        """Open a session for sending asynchronous requests.
+
+        Notes
+        -----
+        This must be called from within a running event loop.
+        """
+
+        # The transport does not retry, as all failed requests are retried in _send_async
+        limits = httpx.Limits(max_connections=self.max_concurrent,
+                              max_keepalive_connections=self.max_concurrent)
+        transport = httpx.AsyncHTTPTransport(http2=HTTP2, limits=limits)
+        self.async_session = httpx.AsyncClient(transport=transport, timeout=TIMEOUT,
+                                               headers=HEADERS, follow_redirects=True)
+
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._lock = asyncio.Lock()
+
+        self.open()
+
+
+    async def close_session(self):
+        """Close the session for asynchronous requests, and set the object as inactive."""
+
+        if self.async_session is not None:
+            await self.async_session.aclose()
+
+        self.async_session = None
+        self._semaphore = None
+        self._lock = None
+
+        self.close()
+
+
+    async def throttle_async(self):
+        """Slow down rate of asynchronous requests, so they are sent at most once per rest time."""
+
+        # Requests queue up on the lock, so that each is spaced from the previous one
+        async with self._lock:
+
+            time_since_req = time.time() - self.time_last_req
+            if time_since_req < self.rest_time:
+                await asyncio.sleep(self.rest_time - time_since_req)
+
+            self.time_last_req = time.time()
+
+
+    async def get_url_async(self, url):
+        """Request a URL asynchronously, using the open session.
+
+        Parameters
+        ----------
+        url : str
+            Web address to request.
+
+        Returns
+        -------
+        out : bytes
+            Content of the requested web page.
+
+        Raises
+        ------
+        httpx.HTTPStatusError
+            If the response has an error status (such as 429, for too many requests).
+
+        Notes
+        -----
+        At most `max_concurrent` requests are in flight at once, and sending is throttled.
+        Failed requests are retried, as in `_send_async`.
+        """
+
+        async with self._semaphore:
+
+            resp = await self._send_async('GET', url, read=True)
+            out = resp.content
+
+            self.n_requests += 1
+
+        return out
+
+
+    async def stream_url_async(self, url, data=None, chunk_size=CHUNK_SIZE):
+        """Request a URL asynchronously, iterating through the content as it is received.
+
+        Parameters
+        ----------
+        url : str
+            Web address to request.
+        data : dict, optional
+            Form data to send with the request. If provided, the request is sent as a POST.
+        chunk_size : int, optional
+            Maximum size, in bytes, of each chunk of content.
+
+        Yields
+        ------
+        chunk : bytes
+            Chunk of the content of the requested web page.
+
+        Raises
+        ------
+        httpx.HTTPStatusError
+            If the response has an error status (such as 429, for too many requests).
+
+        Notes
+        -----
+        Compressed responses are decoded chunk by chunk, as they are received,
+        so the full content of the page is never held in memory.
+        Failed requests are retried, as in `_send_async`, until content starts being received.
+        """
+
+        async with self._semaphore:
+
+            method = 'POST' if data else 'GET'
+
+            resp = await self._send_async(method, url, data)
+            try:
+                async for chunk in resp.aiter_bytes(chunk_size):
+                    yield chunk
+            finally:
+                await resp.aclose()
+
+            self.n_requests += 1
+
+
+    async def _send_async(self, method, url, data=None, read=False):
+        """Send an asynchronous request, retrying failed requests with backoff.
+
+        Parameters
+        ----------
+        method : {'GET', 'POST'}
+            Method to send the request with.
+        url : str
+            Web address to request.
+        data : dict, optional
+            Form data to send with the request.
+        read : bool, optional (default: False)
+            Whether to read the full content of the response, as part of the request.
+
+        Returns
+        -------
+        resp : httpx.Response() object
+            Response to the request. If the content is not read, the response must be closed.
+
+        Raises
+        ------
+        httpx.TransportError
+            If the request still fails, such as from a timeout, after all retries.
+        httpx.HTTPStatusError
+            If the response has an error status, after any retries.
+
+        Notes
+        -----
+        Requests are retried up to `MAX_RETRIES` times, for network errors, timeouts and
+        responses with a status in `RETRY_STATUSES`, waiting twice as long after each try.
+        """
+
+        for attempt in range(MAX_RETRIES + 1):
+
+            await self.throttle_async()
+
+            resp = None
+            try:
+                request = self.async_session.build_request(method, url, data=data)
+                resp = await self.async_session.send(request, stream=True)
+                if read:
+                    await resp.aread()
+
+            except httpx.TransportError:
+                if resp is not None:
+                    await resp.aclose()
+                if attempt == MAX_RETRIES:
+                    raise
+
+            else:
+                if resp.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    if resp.is_error:
+                        await resp.aclose()
+                        resp.raise_for_status()
+                    return resp
+                await resp.aclose()
+
+            await asyncio.sleep(BACKOFF * 2 ** attempt)
+
+
     def open(self):
         """Set the current object as active."""
 
@@ -108,7 +341,37 @@ class Requester(object):
 
 
     def close(self):
-        """Set the current object as inactive."""
+        """Set the current object as inactive, closing any open connections."""
+
+        self.session.close()
 
         self.en_time = time.strftime('%H:%M %A %d %B')
         self.is_active = False
+
+##################################################################################
+##################################################################################
+
+def _make_session(pool_size):
+    """Make a session that pools connections, and retries failed requests.
+
+    Parameters
+    ----------
+    pool_size : int
+        Maximum number of connections to keep in the pool.
+
+    Returns
+    -------
+    session : requests.Session() object
+        Session to use for requests.
+    """
+
+    retries = Retry(total=MAX_RETRIES, backoff_factor=BACKOFF, status_forcelist=RETRY_STATUSES)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                          max_retries=retries)
+
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    return session
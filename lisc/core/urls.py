@@ -36,6 +36,7 @@ field : the search field to search within.
 retmax : Maximum number of records to return.
 retmode : Format to return.
 usehistory : Whether to store findings on remote server.
+api_key : NCBI API key, which allows for a higher rate of requests.
 """
 
 from lisc.core.errors import InconsistentDataError
@@ -70,7 +71,8 @@ class URLS(object):
         Dictionary of all arguments (settings & values) that can be used in e-utils URL.
     """
 
-    def __init__(self, db=None, usehistory='n', retmax=None, field=None, retmode=None, auto_gen=False):
+    def __init__(self, db=None, usehistory='n', retmax=None, field=None, retmode=None,
+                 api_key=None, auto_gen=False):
         """Initialize the ncbi e-utils urls.
 
         Parameters
@@ -85,12 +87,14 @@ class URLS(object):
             The search field to search within.
         retmode : {'lxml', 'xml'}, optional
             The return format for the results.
+        api_key : str, optional
+            An NCBI API key, to add to requests.
         auto_gen : boolean, optional
             Whether to automatically generate URLs (without extra arguments).
         """
 
         # Set up the base url for ncbi e-utils
-        self.eutils = 'http://eutils.ncbi.nlm.nih.gov/entrez/eutils/'
+        self.eutils = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/'
 
         # Initialize variables to store search and fetch URLs
         self.info = str()
@@ -100,7 +104,8 @@ class URLS(object):
 
         # Initialize dictionary to save settings, and add settings to it
         self.settings = dict()
-        self.save_settings(db=db, usehistory=usehistory, retmax=retmax, field=field, retmode=retmode)
+        self.save_settings(db=db, usehistory=usehistory, retmax=retmax, field=field,
+                           retmode=retmode, api_key=api_key)
 
         # Initialize dictionary to save url arguments, and populate it from settings
         self.args = dict()
@@ -111,7 +116,7 @@ class URLS(object):
             self.build_fetch([])
 
 
-    def save_settings(self, usehistory=None, db=None, retmax=None, field=None, retmode=None):
+    def save_settings(self, usehistory=None, db=None, retmax=None, field=None, retmode=None, api_key=None):
         """Save provided setting values into a dictionary object.
 
         Parameters
@@ -124,6 +129,8 @@ class URLS(object):
             The search field to search within.
         retmode :  {'lxml', 'xml'}, optional
             The return format for the results.
+        api_key : str, optional
+            An NCBI API key, to add to requests.
 
         Notes
         -----
@@ -68,13 +68,15 @@ class Count(object):
         self.terms[dim].set_exclusions(exclusions)
 
 
-    def run_scrape(self, db='pubmed', verbose=False):
+    def run_scrape(self, db='pubmed', api_key=None, verbose=False):
         """Scrape co-occurence data.
 
         Parameters
         ----------
         db : str, optional (default: 'pubmed')
             Which pubmed database to use.
+        api_key : str, optional
+            An NCBI API key. If provided, requests are sent at a higher rate.
         verbose : bool, optional (default=False)
             Whether to print out updates.
         """
@@ -86,7 +88,7 @@ class Count(object):
                     scrape_counts(
                         terms_lst_a = self.terms['A'].terms,
                         excls_lst_a = self.terms['A'].exclusions,
-                        db=db, verbose=verbose)
+                        db=db, api_key=api_key, verbose=verbose)
             self.square = True
 
         # Run two different sets of terms
@@ -98,7 +100,7 @@ class Count(object):
                         excls_lst_a = self.terms['A'].exclusions,
                         terms_lst_b = self.terms['B'].terms,
                         excls_lst_b = self.terms['B'].exclusions,
-                        db=db, verbose=verbose)
+                        db=db, api_key=api_key, verbose=verbose)
             self.square = False
 
 
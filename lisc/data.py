@@ -1,6 +1,7 @@
 """Classes and functions to store and process extracted paper data."""
 
 import json
+from collections.abc import Sequence
 
 from lisc.core.db import check_db
 from lisc.core.errors import InconsistentDataError
@@ -30,8 +31,13 @@ class Data(object):
     authors : list of list of str
         Authors of all articles included in object.
             (Last Name, First Name, Initials, Affiliation)
-    words : list of list of unicode
-        Words extracted from each article.
+    words_flat : list of unicode
+        Words extracted from all articles, concatenated in article order.
+    words_off : list of int
+        Offsets of each article's words in words_flat, with length n_articles + 1.
+            Words for article i are words_flat[words_off[i]:words_off[i+1]].
+    words_missing : set of int
+        Indices of articles with no words extracted (such as missing abstracts).
     kws : list of list of str
         List of keywords for each article included in the object.
     years : list of int
@@ -69,7 +75,9 @@ class Data(object):
         self.titles = list()
         self.journals = list()
         self.authors = list()
-        self.words = list()
+        self.words_flat = list()
+        self.words_off = [0]
+        self.words_missing = set()
         self.kws = list()
         self.years = list()
         self.months = list()
@@ -92,7 +100,7 @@ class Data(object):
                 'title': self.titles[ind],
                 'journal': self.journals[ind],
                 'authors': self.authors[ind],
-                'words': self.words[ind],
+                'words': self.get_words(ind),
                 'kws': self.kws[ind],
                 'year': self.years[ind],
                 'month': self.months[ind],
@@ -100,6 +108,57 @@ class Data(object):
             }
 
 
+    def __setstate__(self, state):
+        """Set object state when unpickling.
+
+        Objects pickled before words were stored flat have a list of words per article.
+        These are converted to the flat storage.
+        """
+
+        words = state.pop('words', None)
+        self.__dict__.update(state)
+
+        if words is not None:
+            self.words_flat = list()
+            self.words_off = [0]
+            self.words_missing = set()
+            for new_words in words:
+                self.add_words(new_words)
+
+
+    @property
+    def words(self):
+        """Words extracted from each article, as a sequence of list of unicode.
+
+        Notes
+        -----
+        This is a view onto the flat storage: indexing it gets the words for a single
+        article, without rebuilding the words for all articles.
+        """
+
+        return _WordsView(self)
+
+
+    def get_words(self, ind):
+        """Get the words extracted from a given article.
+
+        Parameters
+        ----------
+        ind : int
+            Index of the article.
+
+        Returns
+        -------
+        list of unicode or None
+            Words from the article. Returns None if no words were extracted.
+        """
+
+        if ind in self.words_missing:
+            return None
+
+        return self.words_flat[self.words_off[ind]:self.words_off[ind + 1]]
+
+
     def add_id(self, new_id):
         """Add a new ID to termWords object.
 
@@ -156,11 +215,16 @@ class Data(object):
 
         Parameters
         ----------
-        new_words : list of str
+        new_words : list of str or None
             List of words from the current article.
         """
 
-        self.words.append(new_words)
+        if new_words is None:
+            self.words_missing.add(len(self.words_off) - 1)
+        else:
+            self.words_flat.extend(new_words)
+
+        self.words_off.append(len(self.words_flat))
 
 
     def add_kws(self, new_kws):
@@ -200,6 +264,38 @@ class Data(object):
         self.dois.append(new_doi)
 
 
+    def add_data(self, new_dat):
+        """Add all the articles from another Data object, after the current articles.
+
+        Parameters
+        ----------
+        new_dat : Data() object
+            Object with the articles to add.
+
+        Notes
+        -----
+        Updates in the history of the new object, after its initialization, are also added.
+        """
+
+        self.ids.extend(new_dat.ids)
+        self.titles.extend(new_dat.titles)
+        self.journals.extend(new_dat.journals)
+        self.authors.extend(new_dat.authors)
+        self.kws.extend(new_dat.kws)
+        self.years.extend(new_dat.years)
+        self.months.extend(new_dat.months)
+        self.dois.extend(new_dat.dois)
+
+        # Shift the word offsets & missing indices of the new articles past the current articles
+        n_words, n_arts = len(self.words_flat), len(self.words_off) - 1
+        self.words_flat.extend(new_dat.words_flat)
+        self.words_off.extend(off + n_words for off in new_dat.words_off[1:])
+        self.words_missing.update(ind + n_arts for ind in new_dat.words_missing)
+
+        self.n_articles += new_dat.n_articles
+        self.history.extend(new_dat.history[1:])
+
+
     def increment_n_articles(self):
         """Increment the number of articles included in current object."""
 
@@ -216,7 +312,7 @@ class Data(object):
         """
 
         # Check that all data fields have length n_articles
-        if not (self.n_articles == len(self.ids) == len(self.titles) == len(self.words)
+        if not (self.n_articles == len(self.ids) == len(self.titles) == len(self.words_off) - 1
                 == len(self.journals) == len(self.authors) == len(self.kws)
                 == len(self.years) == len(self.months) == len(self.dois)):
 
@@ -277,7 +373,9 @@ class Data(object):
         self.titles = list()
         self.journals = list()
         self.authors = list()
-        self.words = list()
+        self.words_flat = list()
+        self.words_off = [0]
+        self.words_missing = set()
         self.kws = list()
         self.years = list()
         self.months = list()
@@ -300,6 +398,54 @@ class Data(object):
 ################################################################################
 ################################################################################
 
+class _WordsView(Sequence):
+    """Read-only view of the words of a Data object, as one item per article."""
+
+    def __init__(self, dat):
+        """Initialize view of the words of a Data object.
+
+        Parameters
+        ----------
+        dat : Data() object
+            Object with the words to view.
+        """
+
+        self._dat = dat
+
+
+    def __len__(self):
+        """Get the number of articles with words stored."""
+
+        return len(self._dat.words_off) - 1
+
+
+    def __getitem__(self, ind):
+        """Get the words for an article, or a list of words for a slice of articles.
+
+        Parameters
+        ----------
+        ind : int or slice
+            Index of the article(s).
+        """
+
+        if isinstance(ind, slice):
+            return [self[i] for i in range(*ind.indices(len(self)))]
+
+        if ind < 0:
+            ind += len(self)
+        if not 0 <= ind < len(self):
+            raise IndexError('Words index out of range.')
+
+        return self._dat.get_words(ind)
+
+
+    def __repr__(self):
+        """Represent the view as the list of words for each article."""
+
+        return repr(list(self))
+
+################################################################################
+
 def _parse_json_dat(f_name):
     for l in open(f_name):
         yield json.loads(l)
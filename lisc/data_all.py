@@ -58,7 +58,7 @@ class DataAll(object):
         self.n_articles = term_data.n_articles
 
         # Combine all articles into single list of all words
-        self.all_words = _combine(term_data.words)
+        self.all_words = list(term_data.words_flat)
         self.all_kws = _combine(term_data.kws)
 
         # Convert lists of all words in frequency distributions
@@ -1,20 +1,65 @@
 """Scraper functions for LISC."""
 
+import re
+import asyncio
 import datetime
+from contextlib import aclosing
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
 import numpy as np
-from bs4 import BeautifulSoup
-import nltk
+from lxml import etree
 from nltk.corpus import stopwords
 
-from lisc.core.utils import comb_terms, extract, CatchNone, CatchNone2
+from lisc.core.utils import comb_terms, CatchNone, CatchNone2
 from lisc.data import Data
 from lisc.core.urls import URLS
-from lisc.core.requester import Requester
+from lisc.core.requester import Requester, REST_TIME_KEY, MAX_CONCURRENT_KEY
+
+##############################################################################################################
+##############################################################################################################
+
+# Set of stopwords, to drop from abstract text
+STOPWORDS = frozenset(stopwords.words('english'))
+
+# Pattern for words in abstract text: runs of letters and digits (excluding punctuation & underscores)
+WORD_RE = re.compile(r'[^\W_]+')
+
+# Settings for parsing XML pages: don't build a lookup table of ID attributes,
+#   and lift the parser limits on the size of text nodes (such as long abstracts)
+PARSER_SETTINGS = {'collect_ids' : False, 'huge_tree' : True}
+PARSER = etree.XMLParser(**PARSER_SETTINGS)
+
+# XPath expressions for the fields extracted from each article, relative to the PubmedArticle tag
+XP_TITLE = etree.XPath('MedlineCitation/Article/ArticleTitle')
+XP_AUTHOR_LIST = etree.XPath('MedlineCitation/Article/AuthorList')
+XP_JOURNAL = etree.XPath('MedlineCitation/Article/Journal/Title')
+XP_ISO_ABBREV = etree.XPath('MedlineCitation/Article/Journal/ISOAbbreviation')
+XP_ABSTRACT = etree.XPath('MedlineCitation/Article/Abstract/AbstractText')
+XP_KEYWORDS = etree.XPath('MedlineCitation/KeywordList/Keyword')
+XP_PUB_DATE = etree.XPath('MedlineCitation/Article/Journal/JournalIssue/PubDate')
+XP_IDS = etree.XPath('PubmedData/ArticleIdList/ArticleId')
+
+# Maximum number of articles to fetch per request, when using history
+FETCH_MAX = 500
+
+# Maximum number of article ids to fetch per request, when not using history
+IDS_MAX = 200
+
+# Pattern for the count of search results, which is the first count tag in the search page
+COUNT_RE = re.compile(rb'<Count>(\d+)</Count>')
+
+# Number of searches to complete between each progress update, when running counts
+PROGRESS_STEP = 100
+
+# Pattern for the API key argument in a URL, which is removed before a URL is recorded
+KEY_RE = re.compile(r'&?api_key=[^&]*')
 
 ##############################################################################################################
 ##############################################################################################################
 
-def scrape_counts(terms_lst_a, excls_lst_a=[], terms_lst_b=[], excls_lst_b=[], db='pubmed', verbose=False):
+def scrape_counts(terms_lst_a, excls_lst_a=[], terms_lst_b=[], excls_lst_b=[], db='pubmed',
+                  api_key=None, verbose=False):
     """Search through pubmed for all abstracts for co-occurence.
 
     Parameters
@@ -29,6 +74,8 @@ def scrape_counts(terms_lst_a, excls_lst_a=[], terms_lst_b=[], excls_lst_b=[], d
         Exclusion words for secondary list of search terms.
     db : str, optional (default: 'pubmed')
         Which pubmed database to use.
+    api_key : str, optional
+        An NCBI API key. If provided, requests are sent at a higher rate.
     verbose : bool, optional (default: False)
         Whether to print out updates.
 
@@ -43,27 +90,87 @@ def scrape_counts(terms_lst_a, excls_lst_a=[], terms_lst_b=[], excls_lst_b=[], d
     term_b_counts : 1d array
         Number of papers for each term, in the secondary list of terms.
     meta_dat : dict
-        Meta data from the scrape.
+        Meta data from the scrape. Includes 'failed', a list of any search URLs that failed.
 
     The scraping does an exact word search for two terms.
 
     The HTML page returned by the pubmed search includes a 'count' field.
     This field contains the number of papers with both terms. This is extracted.
+
+    All search URLs are collected up front, and then requested concurrently.
+
+    If a search fails, such as returning a page without a count, the scrape continues.
+    Values from failed searches are left as -1, in the counts and numbers of papers.
     """
 
+    return _run(_scrape_counts_async(terms_lst_a, excls_lst_a, terms_lst_b,
+                                     excls_lst_b, db, api_key, verbose))
+
+
+def scrape_words(terms_lst, exclusions_lst=[], db='pubmed', retmax=None,
+                 use_hist=False, save_n_clear=True, api_key=None, verbose=False):
+    """Search and scrape from pubmed for all abstracts referring to a given term.
+
+    Parameters
+    ----------
+    terms_lst : list of list of str
+        Search terms.
+    exclusions_lst : list of list of str, optional
+        Exclusion words for search terms.
+    db : str, optional (default: 'pubmed')
+        Which pubmed database to use.
+    retmax : int, optional
+        Maximum number of records to return.
+    use_hist : bool, optional (default: False)
+        Use e-utilities history: storing results on their server, as needed.
+    save_n_clear : bool, optional (default: False)
+        Whether to
+    api_key : str, optional
+        An NCBI API key. If provided, requests are sent at a higher rate.
+    verbose : bool, optional (default: False)
+        Whether to print out updates.
+
+    Returns
+    -------
+    results : list of lisc Data() objects
+        Results from the scraping data for each term.
+    meta_dat : dict
+        Meta data from the scrape.
+
+    Notes
+    -----
+    The scraping does an exact word search for the term given.
+    It then loops through all the articles found about that data.
+    For each article, pulls and saves out data (including title, abstract, authors, etc)
+        Pulls data using the hierarchical tag structure that organize the articles.
+        This procedure loops through each article tag.
+    All terms are scraped concurrently, as are the pages of articles for each term,
+        sharing the rate limits of a single Requester. Results are in the order of the terms.
+    """
+
+    return _run(_scrape_words_async(terms_lst, exclusions_lst, db, retmax,
+                                    use_hist, save_n_clear, api_key, verbose))
+
+##############################################################################################################
+##############################################################################################################
+
+async def _scrape_counts_async(terms_lst_a, excls_lst_a, terms_lst_b, excls_lst_b, db, api_key, verbose):
+    """Run the counts scrape asynchronously. See `scrape_counts` for details."""
+
     # Initialize meta data
     meta_dat = dict()
 
     # Initlaize Requester object
-    req = Requester()
+    req = _make_requester(api_key)
 
     # Set date of when data was scraped
     meta_dat['date'] = datetime.datetime.now().strftime("%Y-%m-%d_%H:%M:%S")
 
     # Get e-utils URLS object. Set retmax as 0, since not using UIDs in this analysis
-    urls = URLS(db=db, retmax='0', retmode='xml', field='TIAB')
-    urls.build_info(['db'])
-    urls.build_search(['db', 'retmax', 'retmode', 'field'])
+    urls = URLS(db=db, retmax='0', retmode='xml', field='TIAB', api_key=api_key)
+    key_arg = ['api_key'] if api_key else []
+    urls.build_info(['db'] + key_arg)
+    urls.build_search(['db', 'retmax', 'retmode', 'field'] + key_arg)
 
     # Sort out terms
     n_terms_a = len(terms_lst_a)
@@ -85,219 +192,331 @@ def scrape_counts(terms_lst_a, excls_lst_a=[], terms_lst_b=[], excls_lst_b=[], d
     term_a_counts = np.ones([n_terms_a], dtype=int) * -1
     term_b_counts = np.ones([n_terms_b], dtype=int) * -1
 
-    # Initialize right size matrices to store data
+    # Initialize right size matrix to store data
     dat_numbers = np.ones([n_terms_a, n_terms_b], dtype=int) * -1
-    dat_percent = np.ones([n_terms_a, n_terms_b]) * -1
 
     # Set diagonal to zero if square (term co-occurence with itself)
     if square:
         np.fill_diagonal(dat_numbers, 0)
-        np.fill_diagonal(dat_percent, 0)
 
-    # Get current information about database being used
-    meta_dat['db_info'] = _get_db_info(req, urls.info)
+    # Make the search term components for each term, including exclusions
+    #   Term-B components are made both on their own, and to be joined onto a term-A search
+    a_frags = [_mk(term) + _mk(excl, 'NOT') for term, excl in zip(terms_lst_a, excls_lst_a)]
+    b_frags = [_mk(term) + _mk(excl, 'NOT') for term, excl in zip(terms_lst_b, excls_lst_b)]
+    b_and_frags = [_mk(term, 'AND') + _mk(excl, 'NOT') for term, excl in zip(terms_lst_b, excls_lst_b)]
 
-    # Loop through each term (list-A)
-    for a_ind, term_a in enumerate(terms_lst_a):
+    # Collect the search URLs to request, each with the indices its result belongs to
+    a_searches, ab_searches = [], []
+
+    # Get number of results for each term search (list-B), which is needed once per term
+    b_searches = [(b_ind, urls.search + b_frag) for b_ind, b_frag in enumerate(b_frags)]
 
-        # Print out status
-        if verbose:
-            print('Running counts for: ', terms_lst_a[a_ind][0])
+    # Loop through each term (list-A)
+    for a_ind, a_frag in enumerate(a_frags):
 
         # Get number of results for current term search
-        url = urls.search + _mk(terms_lst_a[a_ind]) + \
-              _mk(excls_lst_a[a_ind], 'NOT')
-        term_a_counts[a_ind] = _get_count(req, url)
+        a_searches.append((a_ind, urls.search + a_frag))
 
         # Loop through each term (list-b)
-        for b_ind, term_b in enumerate(terms_lst_b):
+        for b_ind in range(n_terms_b):
 
             # Skip scrapes of equivalent term combinations - if single term list
             #  This will skip the diaonal row, and any combinations already scraped
-            if square and dat_numbers[a_ind, b_ind] != -1:
+            if square and b_ind <= a_ind:
                 continue
 
-            # Get number of results for just term search
-            url = urls.search + _mk(terms_lst_b[b_ind]) + \
-            	_mk(excls_lst_b[b_ind], 'NOT')
-            term_b_counts[b_ind] = _get_count(req, url)
-
             # Make URL - Exact Term Version, using double quotes, & exclusions
-            url = urls.search + _mk(terms_lst_a[a_ind]) + \
-                    _mk(excls_lst_a[a_ind], 'NOT') + \
-                    _mk(terms_lst_b[b_ind], 'AND') + \
-                    _mk(excls_lst_b[b_ind], 'NOT')
+            ab_searches.append((a_ind, b_ind, urls.search + a_frag + b_and_frags[b_ind]))
+
+    # Print out status
+    if verbose:
+        print('Running counts for: ', ', '.join(term[0] for term in terms_lst_a))
+
+    searches = a_searches + b_searches + ab_searches
+
+    await req.open_session()
+    try:
+
+        # Get current information about database being used
+        meta_dat['db_info'] = await _get_db_info(req, urls.info)
+
+        # Request each unique search URL once, concurrently
+        #   Searches can repeat, such as the term-A and term-B searches for a single term list
+        unique_urls = list(dict.fromkeys(search[-1] for search in searches))
+        #   A failed search gives a count of None, rather than stopping the whole scrape
+        tasks = [asyncio.ensure_future(_try_get_count(req, url)) for url in unique_urls]
+        try:
+
+            # Print out progress as searches complete
+            for n_done, task in enumerate(asyncio.as_completed(tasks), 1):
+                await task
+                if verbose and (n_done % PROGRESS_STEP == 0 or n_done == len(tasks)):
+                    print('Finished {} of {} searches'.format(n_done, len(tasks)))
+
+        finally:
+
+            # Stop any searches still running, if the scrape is interrupted
+            for task in tasks:
+                task.cancel()
+
+        unique_counts = [task.result() for task in tasks]
+
+        url_counts = dict(zip(unique_urls, unique_counts))
+        counts = [url_counts[search[-1]] for search in searches]
+
+        # Record the searches that failed, so they can be checked or run again
+        meta_dat['failed'] = [_hide_key(url) for url, count in url_counts.items() if count is None]
+
+    finally:
+
+        # Set Requester object as finished being used
+        await req.close_session()
 
-            count = _get_count(req, url)
+    # Split out the counts for each set of searches
+    #   Failed searches are skipped, leaving their values as -1, marking them as not scraped
+    a_counts = counts[:len(a_searches)]
+    b_counts = counts[len(a_searches):len(a_searches) + len(b_searches)]
+    ab_counts = counts[len(a_searches) + len(b_searches):]
 
-            dat_numbers[a_ind, b_ind] = count
-            dat_percent[a_ind, b_ind] = count / term_a_counts[a_ind]
+    for (a_ind, _), count in zip(a_searches, a_counts):
+        if count is not None:
+            term_a_counts[a_ind] = count
 
-            if square:
-                dat_numbers[b_ind, a_ind] = count
-                dat_percent[b_ind, a_ind] = count / term_b_counts[b_ind]
+    for (b_ind, _), count in zip(b_searches, b_counts):
+        if count is not None:
+            term_b_counts[b_ind] = count
 
-        # Save (?)
-        #np.save('dat_numbers_' + term_a[0] + '.npy', dat_numbers)
-        #np.save('dat_percent_' + term_a[0] + '.npy', dat_percent)
+    for (a_ind, b_ind, _), count in zip(ab_searches, ab_counts):
+
+        if count is None:
+            continue
+
+        dat_numbers[a_ind, b_ind] = count
+
+        if square:
+            dat_numbers[b_ind, a_ind] = count
+
+    # Calculate the percentage of papers for each term that include each other term
+    #   Rows are term-A, so each row is normalized by the count of the term-A term
+    #   Percentages are left as 0 where either count is missing, as for failed searches
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dat_percent = np.where((term_a_counts[:, None] > 0) & (dat_numbers >= 0),
+                               dat_numbers / term_a_counts[:, None], 0.)
 
-    # Set Requester object as finished being used
-    req.close()
     meta_dat['req'] = req
 
     return dat_numbers, dat_percent, term_a_counts, term_b_counts, meta_dat
 
 
-def scrape_words(terms_lst, exclusions_lst=[], db='pubmed', retmax=None,
-                 use_hist=False, save_n_clear=True, verbose=False):
+async def _scrape_words_async(terms_lst, exclusions_lst, db, retmax, use_hist,
+                              save_n_clear, api_key, verbose):
+    """Run the words scrape asynchronously. See `scrape_words` for details."""
+
+    meta_dat = dict()
+
+    # Requester object
+    req = _make_requester(api_key)
+
+    # Set date of when data was collected
+    meta_dat['date'] = datetime.datetime.now().strftime("%Y-%m-%d_%H:%M:%S")
+
+    # Get e-utils URLS object
+    hist_val = 'y' if use_hist else 'n'
+    urls = URLS(db=db, usehistory=hist_val, retmax=retmax, retmode='xml', field='TIAB',
+                api_key=api_key, auto_gen=False)
+    key_arg = ['api_key'] if api_key else []
+    urls.build_info(['db'] + key_arg)
+    urls.build_search(['db', 'usehistory', 'retmax', 'retmode', 'field'] + key_arg)
+    urls.build_fetch(['db', 'retmode'] + key_arg)
+
+    # Check exclusions
+    if not exclusions_lst:
+        exclusions_lst = [[] for i in range(len(terms_lst))]
+
+    await req.open_session()
+    try:
+
+        # Get current information about database being used
+        meta_dat['db_info'] = await _get_db_info(req, urls.info)
+
+        # Scrape all the terms concurrently, keeping results in the order of the terms
+        results = await asyncio.gather(*[_scrape_term(req, urls, terms, exclusions, retmax, use_hist,
+                                                      save_n_clear, verbose) \
+            for terms, exclusions in zip(terms_lst, exclusions_lst)])
+        results = list(results)
+
+    finally:
+
+        # Set Requester object as finished being used
+        await req.close_session()
+
+    meta_dat['req'] = req
+
+    return results, meta_dat
+
+
+async def _scrape_term(req, urls, terms, exclusions, retmax, use_hist, save_n_clear, verbose):
     """Search and scrape from pubmed for all abstracts referring to a given term.
 
     Parameters
     ----------
-    terms_lst : list of list of str
+    req : Requester() object
+        Manages requests, shared across all terms.
+    urls : URLS() object
+        URLs to use for searching and fetching.
+    terms : list of str
         Search terms.
-    exclusions_lst : list of list of str, optional
+    exclusions : list of str
         Exclusion words for search terms.
-    db : str, optional (default: 'pubmed')
-        Which pubmed database to use.
-    retmax : int, optional
+    retmax : int
         Maximum number of records to return.
-    use_hist : bool, optional (default: False)
+    use_hist : bool
         Use e-utilities history: storing results on their server, as needed.
-    save_n_clear : bool, optional (default: False)
-        Whether to
-    verbose : bool, optional (default: False)
+    save_n_clear : bool
+        Whether to save out and clear the data once scraped.
+    verbose : bool
         Whether to print out updates.
 
     Returns
     -------
-    results : list of lisc Data() objects
-        Results from the scraping data for each term.
-    meta_dat : dict
-        Meta data from the scrape.
-
-    Notes
-    -----
-    The scraping does an exact word search for the term given.
-    It then loops through all the articles found about that data.
-    For each article, pulls and saves out data (including title, abstract, authors, etc)
-        Pulls data using the hierarchical tag structure that organize the articles.
-        This procedure loops through each article tag.
+    cur_dat : Data() object
+        Results from the scraping data for the term.
     """
 
-    results = []
-    meta_dat = dict()
+    # Print out status
+    if verbose:
+        print('Scraping words for: ', terms[0])
 
-    # Requester object
-    req = Requester()
+    # Initiliaze object to store data for current term papers
+    cur_dat = Data(terms[0], terms)
 
-    # Set date of when data was collected
-    meta_dat['date'] = datetime.datetime.now().strftime("%Y-%m-%d_%H:%M:%S")
+    # Set up search terms - add exclusions, if there are any
+    if exclusions:
+        term_arg = comb_terms(terms, 'or') + comb_terms(exclusions, 'not')
+    else:
+        term_arg = comb_terms(terms, 'or')
 
-    # Get e-utils URLS object
-    hist_val = 'y' if use_hist else 'n'
-    urls = URLS(db=db, usehistory=hist_val, retmax=retmax, retmode='xml', field='TIAB', auto_gen=False)
-    urls.build_info(['db'])
-    urls.build_search(['db', 'usehistory', 'retmax', 'retmode', 'field'])
-    urls.build_fetch(['db', 'retmode'])
+    # Create the url for the search term
+    url = urls.search + term_arg
 
-    # Get current information about database being used
-    meta_dat['db_info'] = _get_db_info(req, urls.info)
+    # Update History
+    cur_dat.update_history('Start Scrape')
 
-    # Check exclusions
-    if not exclusions_lst:
-        exclusions_lst = [[] for i in range(len(terms_lst))]
+    # Get page and parse
+    page = await req.get_url_async(url)
+    page_root = etree.fromstring(page, PARSER)
 
-    # Loop through all the terms
-    for ind, terms in enumerate(terms_lst):
+    # Using history
+    if use_hist:
 
-        # Print out status
-        if verbose:
-            print('Scraping words for: ', terms[0])
+        # Initialize to start at 0
+        ret_start_it = 0
 
-        # Initiliaze object to store data for current term papers
-        cur_dat = Data(terms[0], terms)
+        # Get number of papers, and keys to use history
+        count = int(page_root.findtext('Count'))
+        web_env = page_root.findtext('WebEnv')
+        query_key = page_root.findtext('QueryKey')
 
-        # Set up search terms - add exclusions, if there are any
-        if exclusions_lst[ind]:
-            term_arg = comb_terms(terms, 'or') + comb_terms(exclusions_lst[ind], 'not')
-        else:
-            term_arg = comb_terms(terms, 'or')
+        # Loop through collecting the URLs to pull paper data, using history
+        art_urls = []
+        while ret_start_it < count:
 
-        # Create the url for the search term
-        url = urls.search + term_arg
+            # Set the number of papers per iteration (the ret_max per call)
+            #  This defaults to FETCH_MAX, but will sets to less if fewer needed to reach retmax
+            ret_end_it = min(FETCH_MAX, int(retmax) - ret_start_it)
 
-        # Update History
-        cur_dat.update_history('Start Scrape')
+            # Get article page URL, update position
+            art_urls.append(urls.fetch + '&WebEnv=' + web_env + '&query_key=' + query_key + \
+                            '&retstart=' + str(ret_start_it) + '&retmax=' + str(ret_end_it))
+            ret_start_it += ret_end_it
 
-        # Get page and parse
-        page = req.get_url(url)
-        page_soup = BeautifulSoup(page.content, 'lxml')
+            # Stop if number of scraped papers has reached total retmax
+            if ret_start_it >= int(retmax):
+                break
 
-        # Using history
-        if use_hist:
+        # Get all article pages concurrently & scrape data, each page into its own object
+        pages = await asyncio.gather(*[_scrape_papers(req, art_url, Data(terms[0], terms)) \
+            for art_url in art_urls])
 
-            # Initialize to start at 0
-            ret_start_it = 0
+    # Without using history
+    else:
 
-            # Get number of papers, and keys to use history
-            count = int(page_soup.find('count').text)
-            web_env = page_soup.find('webenv').text
-            query_key = page_soup.find('querykey').text
+        # Get all ids
+        ids = page_root.findall('.//Id')
 
-            # Loop through pulling paper data, using history
-            while ret_start_it < count:
+        # Split ids into chunks, and convert each to string
+        #   These are posted, rather than added to the URL, to avoid URL length limits
+        ids_strs = [_ids_to_str(ids[st:st + IDS_MAX]) for st in range(0, len(ids), IDS_MAX)]
 
-                # Set the number of papers per iteration (the ret_max per call)
-                #  This defaults to 100, but will sets to less if fewer needed to reach retmax
-                ret_end_it = min(100, int(retmax) - ret_start_it)
+        # Get article pages concurrently & scrape data, each page into its own object
+        pages = await asyncio.gather(*[_scrape_papers(req, urls.fetch, Data(terms[0], terms),
+                                                      {'id' : ids_str}) for ids_str in ids_strs])
 
-                # Get article page, scrape data, update position
-                art_url = urls.fetch + '&WebEnv=' + web_env + '&query_key=' + query_key + \
-                          '&retstart=' + str(ret_start_it) + '&retmax=' + str(ret_end_it)
-                cur_dat = _scrape_papers(req, art_url, cur_dat)
-                ret_start_it += ret_end_it
+    # Add the articles from each page in order, so that they are in the order of the search
+    for page_dat in pages:
+        cur_dat.add_data(page_dat)
 
-                # Stop if number of scraped papers has reached total retmax
-                if ret_start_it >= int(retmax):
-                    break
+    # Check consistency of extracted results
+    cur_dat.check_results()
+    cur_dat.update_history('End Scrape')
 
-        # Without using history
-        else:
+    # Save out and clear data
+    if save_n_clear:
+        cur_dat.save_n_clear()
 
-            # Get all ids
-            ids = page_soup.find_all('id')
+    return cur_dat
 
-            # Convert ids to string
-            ids_str = _ids_to_str(ids)
 
-            # Get article page & scrape data
-            art_url = urls.fetch + '&id=' + ids_str
-            cur_dat = _scrape_papers(req, art_url, cur_dat)
+def _make_requester(api_key):
+    """Make a Requester object, with rate limits set by whether an API key is used.
 
-        # Check consistency of extracted results
-        cur_dat.check_results()
-        cur_dat.update_history('End Scrape')
+    Parameters
+    ----------
+    api_key : str or None
+        An NCBI API key, if one is being used.
 
-        # Save out and clear data
-        if save_n_clear:
-            cur_dat.save_n_clear()
-        results.append(cur_dat)
+    Returns
+    -------
+    Requester() object
+        Object to manage requests.
+    """
 
-    # Set Requester object as finished being used
-    req.close()
-    meta_dat['req'] = req
+    if api_key:
+        return Requester(rest_time=REST_TIME_KEY, max_concurrent=MAX_CONCURRENT_KEY)
+    else:
+        return Requester()
 
-    return results, meta_dat
 
-##############################################################################################################
-##############################################################################################################
+def _run(coro):
+    """Run a coroutine to completion, and return its result.
 
-def _get_db_info(req, info_url):
+    Parameters
+    ----------
+    coro : coroutine
+        Coroutine to run.
+
+    Notes
+    -----
+    If an event loop is already running in the current thread (for example, in a
+    notebook), the coroutine is run in its own event loop, in a separate thread.
+    """
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+async def _get_db_info(req, info_url):
     """Calls EInfo to get info and status of db to be used for scraping.
 
     Parameters
     ----------
+    req : Requester() object
+        Manages requests.
     info_url : str
         URL to request db information from.
 
@@ -307,22 +526,23 @@ def _get_db_info(req, info_url):
         Database information.
     """
 
-    # Get the info page and parse with BeautifulSoup
-    info_page = req.get_url(info_url)
-    info_page_soup = BeautifulSoup(info_page.content, 'lxml')
+    # Get the info page and parse
+    info_page = await req.get_url_async(info_url)
+    info_root = _parse_xml(info_page)
 
-    # Set list of fields to extract from eInfo
-    fields = ['dbname', 'menuname', 'description', 'dbbuild', 'count', 'lastupdate']
+    # Set list of fields to extract from eInfo, with the tag each is stored in
+    fields = {'dbname' : 'DbName', 'menuname' : 'MenuName', 'description' : 'Description',
+              'dbbuild' : 'DbBuild', 'count' : 'Count', 'lastupdate' : 'LastUpdate'}
 
     # Extract basic infomation into a dictionary
     db_info = dict()
-    for field in fields:
-        db_info[field] = extract(info_page_soup, field, 'str')
+    for field, tag in fields.items():
+        db_info[field] = _find_text(info_root, './/' + tag)
 
     return db_info
 
 
-def _scrape_papers(req, art_url, cur_dat):
+async def _scrape_papers(req, art_url, cur_dat, data=None):
     """Scrape information for each article found for a given term.
 
     Parameters
@@ -331,6 +551,10 @@ def _scrape_papers(req, art_url, cur_dat):
         Manages request
     art_url : str
         URL for the article to be scraped
+    cur_dat : Data() object
+        Object to store information for the current term.
+    data : dict, optional
+        Form data to post with the request, such as the ids of the articles.
 
     Returns
     -------
@@ -338,30 +562,49 @@ def _scrape_papers(req, art_url, cur_dat):
         Object to store information for the current term.
     """
 
-    # Get page of all articles
-    art_page = req.get_url(art_url)
-    art_page_soup = BeautifulSoup(art_page.content, "xml")
+    # Initialize parser to return each article once it has been fully parsed
+    #   A new parser is needed for each page, as pages are parsed concurrently
+    parser = etree.XMLPullParser(events=('end',), tag='PubmedArticle', **PARSER_SETTINGS)
+
+    try:
+
+        # Stream the page of all articles, feeding it to the parser as it is received
+        #   The stream is closed on exit, so the response is released if parsing fails
+        async with aclosing(req.stream_url_async(art_url, data)) as chunks:
+            async for chunk in chunks:
+                parser.feed(chunk)
+
+                # Loop through each completed article, extracting relevant information
+                for _, art in parser.read_events():
+
+                    # Get ID of current article
+                    new_id = _process_ids(XP_IDS(art), 'pubmed')
 
-    # Pull out articles
-    articles = art_page_soup.findAll('PubmedArticle')
+                    # Extract and add all relevant info from current articles to Data object
+                    cur_dat = _extract_add_info(cur_dat, new_id, art)
 
-    # Loop through each article, extracting relevant information
-    for ind, art in enumerate(articles):
+                    # Clear the article, and any previous ones, so only one is held in memory
+                    art.clear()
+                    while art.getprevious() is not None:
+                        del art.getparent()[0]
 
-        # Get ID of current article
-        new_id = _process_ids(extract(art, 'ArticleId', 'all'), 'pubmed')
+        parser.close()
 
-        # Extract and add all relevant info from current articles to Data object
-        cur_dat = _extract_add_info(cur_dat, new_id, art)
+    # Stop if the page is not valid XML, keeping any articles parsed so far
+    #   The failure is recorded in the history, so that missing articles can be noticed
+    except etree.XMLSyntaxError as err:
+        cur_dat.update_history('Failed Parse: ' + _hide_key(art_url) + ' (' + str(err) + ')')
 
     return cur_dat
 
 
-def _get_count(req, url):
+async def _get_count(req, url):
     """Get the count of how many articles listed on search results URL.
 
     Parameters
     ----------
+    req : Requester() object
+        Manages requests.
     url : str
         URL to search with.
 
@@ -369,21 +612,134 @@ def _get_count(req, url):
     -------
     count : int
         Count of the number of articles found.
+
+    Raises
+    ------
+    ValueError
+        If the search page does not include a count.
     """
 
     # Request page from URL
-    page = req.get_url(url)
-    page_soup = BeautifulSoup(page.content, 'lxml')
+    page = await req.get_url_async(url)
+
+    # Get the first count tag - a missing count means the search failed, not that it found nothing
+    count = COUNT_RE.search(page)
+    if not count:
+        raise ValueError('No count found in search results for URL: ' + _hide_key(url))
+
+    return int(count.group(1))
+
+
+async def _try_get_count(req, url):
+    """Get the count of articles for a search URL, or None if the search fails.
+
+    Parameters
+    ----------
+    req : Requester() object
+        Manages requests.
+    url : str
+        URL to search with.
 
-    # Get all count tags
-    counts = extract(page_soup, 'count', 'all')
+    Returns
+    -------
+    count : int or None
+        Count of the number of articles found, or None if the search failed.
+    """
 
     try:
-        count = int(counts[0].text)
-    except IndexError:
-        count = 0
+        return await _get_count(req, url)
+    except (ValueError, httpx.HTTPError):
+        return None
+
+
+def _hide_key(url):
+    """Remove the API key from a URL, so that it can be recorded or printed.
+
+    Parameters
+    ----------
+    url : str
+        URL, which may include an api_key argument.
+
+    Returns
+    -------
+    str
+        URL without the api_key argument.
+    """
+
+    return KEY_RE.sub('', url)
 
-    return count
+
+def _parse_xml(page):
+    """Parse the content of a requested XML page.
+
+    Parameters
+    ----------
+    page : bytes
+        Content of the requested page.
+
+    Returns
+    -------
+    lxml.etree._Element or None
+        Root element of the page. Returns None if the page is not valid XML.
+    """
+
+    try:
+        return etree.fromstring(page, PARSER)
+    except etree.XMLSyntaxError:
+        return None
+
+
+def _find_text(elem, path):
+    """Find the first element matching a path, and get all of its text.
+
+    Parameters
+    ----------
+    elem : lxml.etree._Element or None
+        Element to search within.
+    path : str
+        Path of the element to find.
+
+    Returns
+    -------
+    str or None
+        All text within the found element. Returns None if the element is unavailable.
+    """
+
+    return _text(elem.find(path) if elem is not None else None)
+
+
+def _text(elem):
+    """Get all the text within an element.
+
+    Parameters
+    ----------
+    elem : lxml.etree._Element or None
+        Element to get the text of.
+
+    Returns
+    -------
+    str or None
+        All text within the element. Returns None if the element is unavailable.
+    """
+
+    return ''.join(elem.itertext()) if elem is not None else None
+
+
+def _first(found):
+    """Get the first element found by an XPath expression.
+
+    Parameters
+    ----------
+    found : list of lxml.etree._Element
+        Elements found by an XPath expression.
+
+    Returns
+    -------
+    lxml.etree._Element or None
+        The first element. Returns None if no elements were found.
+    """
+
+    return found[0] if found else None
 
 
 def _mk(t_lst, cm=''):
@@ -421,7 +777,7 @@ def _extract_add_info(cur_dat, new_id, art):
         Object to store information for the current term.
     new_id : int
         Paper ID of the new paper.
-    art : bs4.element.Tag() object
+    art : lxml.etree._Element
         Extracted pubmed article.
 
     Returns
@@ -437,13 +793,13 @@ def _extract_add_info(cur_dat, new_id, art):
 
     # Add ID of current article
     cur_dat.add_id(new_id)
-    cur_dat.add_title(extract(art, 'ArticleTitle', 'str'))
-    cur_dat.add_authors(_process_authors(extract(art, 'AuthorList', 'raw')))
-    cur_dat.add_journal(extract(art, 'Title', 'str'), extract(art, 'ISOAbbreviation', 'str'))
-    cur_dat.add_words(_process_words(extract(art, 'AbstractText', 'str')))
-    cur_dat.add_kws(_process_kws(extract(art, 'Keyword', 'all')))
-    cur_dat.add_pub_date(_process_pub_date(extract(art, 'PubDate', 'raw')))
-    cur_dat.add_doi(_process_ids(extract(art, 'ArticleId', 'all'), 'doi'))
+    cur_dat.add_title(_text(_first(XP_TITLE(art))))
+    cur_dat.add_authors(_process_authors(_first(XP_AUTHOR_LIST(art))))
+    cur_dat.add_journal(_text(_first(XP_JOURNAL(art))), _text(_first(XP_ISO_ABBREV(art))))
+    cur_dat.add_words(_process_words(_text(_first(XP_ABSTRACT(art)))))
+    cur_dat.add_kws(_process_kws(XP_KEYWORDS(art)))
+    cur_dat.add_pub_date(_process_pub_date(_first(XP_PUB_DATE(art))))
+    cur_dat.add_doi(_process_ids(XP_IDS(art), 'doi'))
 
     # Increment number of articles included in Data
     cur_dat.increment_n_articles()
@@ -456,7 +812,7 @@ def _ids_to_str(ids):
 
     Parameters
     ----------
-    ids : bs4.element.ResultSet
+    ids : list of lxml.etree._Element
         List of pubmed ids.
 
     Returns
@@ -465,18 +821,7 @@ def _ids_to_str(ids):
         A string of all concatenated ids.
     """
 
-    # Check how many ids in list
-    n_ids = len(ids)
-
-    # Initialize string with first id
-    ids_str = str(ids[0].text)
-
-    # Loop through rest of the id's, appending to end of id_str
-    for i in range(1, n_ids):
-        ids_str = ids_str + ',' + str(ids[i].text)
-
-    # Return string of ids
-    return ids_str
+    return ','.join(str(i.text) for i in ids)
 
 
 @CatchNone
@@ -494,12 +839,11 @@ def _process_words(text):
         List of words, after processing.
     """
 
-    # Tokenize input text
-    words = nltk.word_tokenize(text)
+    # Tokenize lower case text into words, which drops punctuation
+    words = WORD_RE.findall(text.lower())
 
-    # Remove stop words, and non-alphabetical tokens (punctuation). Return the result.
-    words_cleaned =  [word.lower() for word in words if (
-        (not word.lower() in stopwords.words('english')) & word.isalnum())]
+    # Remove stop words. Return the result.
+    words_cleaned = [word for word in words if word not in STOPWORDS]
 
     return words_cleaned
 
@@ -510,7 +854,7 @@ def _process_kws(keywords):
 
     Parameters
     ----------
-    kws : bs4.element.ResultSet
+    kws : list of lxml.etree._Element
         List of all the keyword tags.
 
     Returns
@@ -519,7 +863,7 @@ def _process_kws(keywords):
         List of all the keywords.
     """
 
-    return [kw.text.lower() for kw in keywords]
+    return [''.join(kw.itertext()).lower() for kw in keywords]
 
 
 @CatchNone
@@ -528,7 +872,7 @@ def _process_authors(author_list):
 
     Parameters
     ----------
-    author_list : bs4.element.Tag
+    author_list : lxml.etree._Element
         AuthorList tag, which contains tags related to author data.
 
     Returns
@@ -538,15 +882,15 @@ def _process_authors(author_list):
     """
 
     # Pull out all author tags from the input
-    authors = extract(author_list, 'Author', 'all')
+    authors = author_list.findall('Author')
 
     # Initialize list to return
     out = []
 
     # Extract data for each author
     for author in authors:
-        out.append((extract(author, 'LastName', 'str'), extract(author, 'ForeName', 'str'),
-                    extract(author, 'Initials', 'str'), extract(author, 'Affiliation', 'str')))
+        out.append((_find_text(author, 'LastName'), _find_text(author, 'ForeName'),
+                    _find_text(author, 'Initials'), _find_text(author, './/Affiliation')))
 
     return out
 
@@ -557,7 +901,7 @@ def _process_pub_date(pub_date):
 
     Parameters
     ----------
-    pub_date : bs4.element.Tag
+    pub_date : lxml.etree._Element
         PubDate tag, which contains tags with publication date information.
 
     Returns
@@ -569,11 +913,11 @@ def _process_pub_date(pub_date):
     """
 
     # Extract year, convert to int if not None
-    year = extract(pub_date, 'Year', 'str')
+    year = _find_text(pub_date, 'Year')
     year = int(year) if year else year
 
     # Extract month
-    month = extract(pub_date, 'Month', 'str')
+    month = _find_text(pub_date, 'Month')
 
     return year, month
 
@@ -584,7 +928,7 @@ def _process_ids(ids, id_type):
 
     Parameters
     ----------
-    ids : bs4.element.ResultSet
+    ids : list of lxml.etree._Element
         All the ArticleId tags, with all IDs for the article.
 
     Returns
@@ -593,6 +937,6 @@ def _process_ids(ids, id_type):
         The DOI if available, otherwise None.
     """
 
-    lst = [str(i.contents[0]) for i in ids if i.attrs == {'IdType' : id_type}]
+    lst = [i.text for i in ids if i.get('IdType') == id_type]
 
     return None if not lst else lst
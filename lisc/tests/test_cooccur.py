@@ -0,0 +1,85 @@
+"""Tests for the co-occurence functions from lisc."""
+
+import numpy as np
+from py.test import raises
+
+from lisc.data import Data
+from lisc.words import Words
+from lisc.cooccur import get_cooccur
+from lisc.tests.utils import TestDB as TDB
+from lisc.tests.utils import load_data
+
+###################################################################################
+###################################################################################
+###################################################################################
+
+def test_get_cooccur():
+    """Test the get_cooccur function."""
+
+    corpus = [['erp', 'language', 'memory'], ['erp', 'unknown', 'memory'], None]
+    word2id = {'erp' : 0, 'language' : 1, 'memory' : 2}
+
+    cooccur = get_cooccur(corpus, word2id, window=1)
+
+    expected = np.array([[0, 1, 1],
+                         [1, 0, 1],
+                         [1, 1, 0]])
+    assert np.array_equal(cooccur, expected)
+
+    cooccur = get_cooccur(corpus, word2id, window=2)
+    assert cooccur[0, 2] == 2
+    assert np.array_equal(cooccur, cooccur.T)
+
+def test_get_cooccur_repeats():
+    """Test the get_cooccur function counts each pair of a repeated word once."""
+
+    cooccur = get_cooccur([['erp', 'erp', 'memory']], {'erp' : 0, 'memory' : 1}, window=1)
+
+    expected = np.array([[1, 1],
+                         [1, 0]])
+    assert np.array_equal(cooccur, expected)
+
+def test_get_cooccur_empty():
+    """Test the get_cooccur function with no words to count."""
+
+    cooccur = get_cooccur([[], None], {'erp' : 0})
+
+    assert cooccur.shape == (1, 1)
+    assert not cooccur.any()
+
+def test_words_get_cooccur():
+    """Test the get_cooccur method of the Words object."""
+
+    words = Words()
+
+    dat = Data('test', ['test'])
+    dat.add_words(['erp', 'language', 'memory'])
+    dat.add_words(None)
+    words.add_results(dat)
+
+    cooccur = words.get_cooccur('test', {'erp' : 0, 'memory' : 1}, window=2)
+
+    assert cooccur[0, 1] == 1
+    assert cooccur[1, 0] == 1
+
+def test_words_get_cooccur_cleared():
+    """Test the get_cooccur method of the Words object, for data that has been cleared."""
+
+    tdb = TDB()
+    words = Words()
+
+    # Check data that has been saved out and cleared is loaded back in
+    dat = load_data(add_dat=True)
+    dat.save(tdb)
+    dat.clear()
+    words.add_results(dat)
+
+    cooccur = words.get_cooccur('test', {'new' : 0, 'dat' : 1}, db=tdb)
+
+    assert cooccur[0, 1] == 1
+    assert dat.n_articles == 0
+
+    # Check error for data without any words
+    words.add_results(Data('empty', ['empty']))
+    with raises(ValueError):
+        words.get_cooccur('empty', {'new' : 0})
@@ -1,6 +1,10 @@
 """Tests for Requestor functions and classes from lisc.core."""
 
 import time
+import asyncio
+
+import httpx
+from py.test import raises
 
 from lisc.core.requester import Requester
 
@@ -13,6 +17,14 @@ def test_requester():
 
     assert Requester()
 
+def test_requester_limits():
+    """Test the Requester object with custom rate limits."""
+
+    req = Requester(rest_time=0.1, max_concurrent=10)
+
+    assert req.rest_time == 0.1
+    assert req.max_concurrent == 10
+
 def test_check():
     """Test the check method."""
 
@@ -49,6 +61,71 @@ def test_get_url():
 
     assert web_page
 
+def test_get_url_async():
+    """Test the get_url_async method, with opening and closing a session."""
+
+    req = Requester()
+
+    async def get_page():
+        await req.open_session()
+        web_page = await req.get_url_async('http://www.google.com')
+        await req.close_session()
+        return web_page
+
+    web_page = asyncio.run(get_page())
+
+    assert web_page
+    assert not req.is_active
+
+def _mock_session(statuses):
+    """Make an async session that responds with each of the given statuses, in turn."""
+
+    statuses = iter(statuses)
+
+    def handler(request):
+        return httpx.Response(next(statuses), content=b'<Count>1</Count>')
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+def test_get_url_async_retry():
+    """Test that get_url_async retries failed requests, and raises once retries run out."""
+
+    req = Requester(rest_time=0)
+
+    async def get_page(statuses):
+        await req.open_session()
+        await req.async_session.aclose()
+        req.async_session = _mock_session(statuses)
+        try:
+            return await req.get_url_async('https://eutils.ncbi.nlm.nih.gov')
+        finally:
+            await req.close_session()
+
+    assert asyncio.run(get_page([429, 503, 200])) == b'<Count>1</Count>'
+    assert req.n_requests == 1
+
+    with raises(httpx.HTTPStatusError):
+        asyncio.run(get_page([429, 429, 429, 429]))
+
+    with raises(httpx.HTTPStatusError):
+        asyncio.run(get_page([404]))
+
+def test_stream_url_async():
+    """Test the stream_url_async method."""
+
+    req = Requester()
+
+    async def get_chunks():
+        await req.open_session()
+        chunks = [chunk async for chunk in req.stream_url_async('http://www.google.com')]
+        await req.close_session()
+        return chunks
+
+    chunks = asyncio.run(get_chunks())
+
+    assert b''.join(chunks)
+    assert req.n_requests == 1
+
 def test_open():
     """Test the open method."""
 
@@ -68,3 +68,14 @@ def test_build_fetch():
     urls.build_fetch(['db', 'retmode'])
 
     assert urls.fetch
+
+def test_build_api_key():
+    """Test that an API key is added to URLs, when provided."""
+
+    urls = URLS(db='pubmed', retmode='xml', api_key='key')
+
+    urls.build_search(['db', 'retmode', 'api_key'])
+    urls.build_fetch(['db', 'retmode', 'api_key'])
+
+    assert 'api_key=key' in urls.search
+    assert 'api_key=key' in urls.fetch
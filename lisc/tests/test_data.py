@@ -1,5 +1,7 @@
 """Tests for the Data() class and related functions from lisc."""
 
+import pickle
+
 from py.test import raises
 
 from lisc.data import *
@@ -56,6 +58,61 @@ def test_add_dat():
 
     assert dat.words
 
+def test_get_words():
+    """   """
+
+    dat = load_data()
+    dat.add_words(['new', 'dat'])
+    dat.add_words(None)
+    dat.add_words(['more'])
+
+    assert dat.get_words(0) == ['new', 'dat']
+    assert dat.get_words(1) is None
+    assert list(dat.words) == [['new', 'dat'], None, ['more']]
+    assert dat.words[-1] == ['more']
+    assert dat.words[1:] == [None, ['more']]
+    assert len(dat.words) == 3
+    assert dat.words_flat == ['new', 'dat', 'more']
+
+    with raises(IndexError):
+        dat.words[3]
+
+def test_setstate_old_words():
+    """Test that unpickling Data saved with a list of words per article converts it."""
+
+    dat = load_data()
+    state = {key : val for key, val in dat.__dict__.items()
+             if key not in ['words_flat', 'words_off', 'words_missing']}
+    state['words'] = [['old', 'dat'], None, ['words']]
+
+    old_dat = Data.__new__(Data)
+    old_dat.__setstate__(pickle.loads(pickle.dumps(state)))
+
+    assert old_dat.words_flat == ['old', 'dat', 'words']
+    assert old_dat.get_words(0) == ['old', 'dat']
+    assert old_dat.get_words(1) is None
+    assert list(old_dat.words) == [['old', 'dat'], None, ['words']]
+
+def test_add_data():
+    """Test the add_data method."""
+
+    dat = load_data(add_dat=True)
+    dat.add_words(None)
+
+    new_dat = Data('test', ['test'])
+    new_dat.add_id(2)
+    new_dat.add_words(['other', 'words'])
+    new_dat.add_words(None)
+    new_dat.increment_n_articles()
+    new_dat.update_history('Failed Parse')
+
+    dat.add_data(new_dat)
+
+    assert dat.ids == [1, 2]
+    assert dat.n_articles == 2
+    assert list(dat.words) == [['new', 'dat'], None, ['other', 'words'], None]
+    assert dat.history[-1] == 'Failed Parse'
+
 def test_add_kws():
     """   """
 
@@ -0,0 +1,256 @@
+"""Tests for the scrape functions from lisc."""
+
+import asyncio
+
+import numpy as np
+from lxml import etree
+from py.test import raises
+
+from lisc.data import Data
+from lisc.scrape import _parse_xml, _find_text, _extract_add_info, _ids_to_str
+from lisc.scrape import _process_words, _process_kws, _process_ids
+from lisc.scrape import _scrape_papers, _scrape_counts_async, _get_count, _hide_key
+
+#######################################################################################
+############################## TEST UTILITIES - SCRAPE ################################
+#######################################################################################
+
+class StubStreamer(object):
+    """Requester stand-in that streams a given page in chunks, without a connection."""
+
+    def __init__(self, page, chunk_size=50):
+
+        self.chunks = [page[ind:ind+chunk_size] for ind in range(0, len(page), chunk_size)]
+        self.closed = False
+
+    async def stream_url_async(self, url, data=None):
+
+        try:
+            for chunk in self.chunks:
+                yield chunk
+        finally:
+            self.closed = True
+
+class StubCounter(object):
+    """Requester stand-in that returns search counts, without a connection.
+
+    Counts are given for the set of terms in a search, with any other search failing.
+    """
+
+    def __init__(self, counts, terms):
+
+        self.counts = counts
+        self.terms = terms
+        self.urls = []
+
+    async def open_session(self):
+        pass
+
+    async def close_session(self):
+        pass
+
+    async def get_url_async(self, url):
+
+        self.urls.append(url)
+
+        if 'einfo' in url:
+            return b'<eInfoResult/>'
+
+        found = frozenset(term for term in self.terms if '"' + term + '"' in url)
+        if found not in self.counts:
+            return b'<eSearchResult><ERROR>Search failed</ERROR></eSearchResult>'
+
+        return '<eSearchResult><Count>{}</Count></eSearchResult>'.format(self.counts[found]).encode()
+
+def _make_page(ids):
+    """Make a PubmedArticleSet page, with an article for each given id."""
+
+    arts = ''.join(('<PubmedArticle><MedlineCitation><Article>'
+                    '<ArticleTitle>Title {0}</ArticleTitle></Article></MedlineCitation>'
+                    '<PubmedData><ArticleIdList><ArticleId IdType="pubmed">{0}</ArticleId>'
+                    '</ArticleIdList></PubmedData></PubmedArticle>').format(ind) for ind in ids)
+
+    return ('<?xml version="1.0" ?><PubmedArticleSet>' + arts + '</PubmedArticleSet>').encode()
+
+#######################################################################################
+################################ TESTS - LISC - SCRAPE ################################
+#######################################################################################
+
+def test_parse_xml():
+    """Test the _parse_xml function."""
+
+    root = _parse_xml(b'<eSearchResult><Count>12</Count></eSearchResult>')
+    assert root.tag == 'eSearchResult'
+
+    assert _parse_xml(b'{"error": "not xml"}') is None
+
+def test_find_text():
+    """Test the _find_text function."""
+
+    root = etree.fromstring('<Article><Title>A <i>nested</i> title</Title></Article>')
+
+    assert _find_text(root, 'Title') == 'A nested title'
+    assert _find_text(root, 'Bad') is None
+    assert _find_text(None, 'Title') is None
+
+def test_extract_add_info():
+    """Test the _extract_add_info function."""
+
+    art = etree.fromstring(
+        ('<PubmedArticle><MedlineCitation><Article>'
+         '<Journal><JournalIssue><PubDate><Year>2017</Year><Month>May</Month></PubDate>'
+         '</JournalIssue><Title>Cognitive Science</Title><ISOAbbreviation>Cogn Sci</ISOAbbreviation>'
+         '</Journal><ArticleTitle>A model of the N400.</ArticleTitle>'
+         '<Abstract><AbstractText>Ten <i>simulated</i> ERPs.</AbstractText></Abstract>'
+         '<AuthorList><Author><LastName>Last</LastName><ForeName>First</ForeName>'
+         '<Initials>F</Initials></Author></AuthorList></Article>'
+         '<KeywordList><Keyword>Computational Modeling</Keyword></KeywordList></MedlineCitation>'
+         '<PubmedData><ArticleIdList><ArticleId IdType="doi">10.1111/cogs.12461</ArticleId>'
+         '</ArticleIdList><ReferenceList><Reference><ArticleIdList>'
+         '<ArticleId IdType="doi">10.1/reference</ArticleId></ArticleIdList></Reference>'
+         '</ReferenceList></PubmedData></PubmedArticle>'))
+
+    dat = _extract_add_info(Data('test'), 111111, art)
+
+    assert dat.ids[0] == 111111
+    assert dat.titles[0] == 'A model of the N400.'
+    assert dat.journals[0] == ('Cognitive Science', 'Cogn Sci')
+    assert dat.authors[0] == [('Last', 'First', 'F', None)]
+    assert dat.words[0] == ['ten', 'simulated', 'erps']
+    assert dat.kws[0] == ['computational modeling']
+    assert dat.years[0] == 2017
+    assert dat.months[0] == 'May'
+    assert dat.dois[0] == ['10.1111/cogs.12461']
+
+    # Check article with all fields missing
+    dat = _extract_add_info(dat, 999999, etree.fromstring('<PubmedArticle/>'))
+
+    assert dat.titles[1] is None
+    assert dat.words[1] is None
+    assert dat.kws[1] == []
+    assert dat.years[1] is None
+    assert dat.dois[1] is None
+    assert dat.n_articles == 2
+
+def test_ids_to_str():
+    """Test the _ids_to_str function."""
+
+    root = etree.fromstring('<IdList><Id>1111</Id><Id>2222</Id></IdList>')
+
+    assert _ids_to_str(root.findall('Id')) == '1111,2222'
+
+def test_process_words():
+    """Test the _process_words function."""
+
+    words_out = _process_words('The Last wOrd, in they eRp! Event-related α-synuclein_')
+
+    assert words_out == ['last', 'word', 'erp', 'event', 'related', 'α', 'synuclein']
+
+def test_process_kws():
+    """Test the _process_kws function."""
+
+    root = etree.fromstring('<KeywordList><Keyword>ERP</Keyword><Keyword>N400</Keyword></KeywordList>')
+
+    assert _process_kws(root.findall('Keyword')) == ['erp', 'n400']
+
+def test_process_ids():
+    """Test the _process_ids function."""
+
+    root = etree.fromstring(('<ArticleIdList><ArticleId IdType="pubmed">111</ArticleId>'
+                             '<ArticleId IdType="doi">10.1/a</ArticleId></ArticleIdList>'))
+    ids = root.findall('ArticleId')
+
+    assert _process_ids(ids, 'pubmed') == ['111']
+    assert _process_ids(ids, 'doi') == ['10.1/a']
+    assert _process_ids(ids, 'pmc') is None
+
+def test_scrape_papers():
+    """Test the _scrape_papers function, streaming a page split across chunks."""
+
+    req = StubStreamer(_make_page(['111', '222']))
+    dat = asyncio.run(_scrape_papers(req, 'url', Data('test')))
+
+    assert dat.n_articles == 2
+    assert dat.ids == [['111'], ['222']]
+    assert dat.titles == ['Title 111', 'Title 222']
+    assert req.closed
+
+def test_scrape_papers_bad_xml():
+    """Test that _scrape_papers keeps parsed articles, and records a failed parse."""
+
+    req = StubStreamer(_make_page(['111', '222'])[:-80] + b'</Bad>')
+    dat = asyncio.run(_scrape_papers(req, 'efetch.fcgi?db=pubmed&api_key=secret', Data('test')))
+
+    assert dat.n_articles == 1
+    assert dat.history[-1].startswith('Failed Parse: efetch.fcgi?db=pubmed ')
+    assert 'secret' not in dat.history[-1]
+    assert req.closed
+
+def test_scrape_counts_async(monkeypatch):
+    """Test the _scrape_counts_async function, for a single list of terms."""
+
+    counts = {frozenset('a') : 10, frozenset('b') : 20, frozenset('c') : 0,
+              frozenset('ab') : 5, frozenset('ac') : 0, frozenset('bc') : 0}
+    req = StubCounter(counts, ['a', 'b', 'c'])
+    monkeypatch.setattr('lisc.scrape._make_requester', lambda api_key: req)
+
+    dat_numbers, dat_percent, term_a_counts, term_b_counts, _ = asyncio.run(
+        _scrape_counts_async([['a'], ['b'], ['c']], [], [], [], 'pubmed', None, False))
+
+    # Check each unique search is only requested once: 6 searches, and the db info
+    assert len(req.urls) == 7
+
+    assert list(term_a_counts) == [10, 20, 0]
+    assert list(term_b_counts) == [10, 20, 0]
+    assert np.array_equal(dat_numbers, dat_numbers.T)
+    assert dat_numbers[0, 1] == 5
+
+    assert dat_percent[0, 1] == 0.5
+    assert not dat_percent[2].any()
+
+def test_scrape_counts_async_failed(monkeypatch):
+    """Test that _scrape_counts_async continues past a failed search, and records it."""
+
+    counts = {frozenset('a') : 10, frozenset('b') : 20, frozenset('c') : 30, frozenset('ab') : 5}
+    req = StubCounter(counts, ['a', 'b', 'c'])
+    monkeypatch.setattr('lisc.scrape._make_requester', lambda api_key: req)
+
+    dat_numbers, dat_percent, term_a_counts, _, meta_dat = asyncio.run(
+        _scrape_counts_async([['a'], ['b'], ['c']], [], [], [], 'pubmed', None, False))
+
+    assert list(term_a_counts) == [10, 20, 30]
+    assert dat_numbers[0, 1] == dat_numbers[1, 0] == 5
+
+    # Check the failed searches are marked as not scraped, and listed
+    assert dat_numbers[0, 2] == dat_numbers[2, 0] == -1
+    assert dat_numbers[1, 2] == dat_numbers[2, 1] == -1
+    assert dat_percent[0, 2] == 0
+    assert len(meta_dat['failed']) == 2
+
+def test_scrape_counts_async_verbose(monkeypatch, capsys):
+    """Test that _scrape_counts_async prints progress as searches complete."""
+
+    req = StubCounter({frozenset('a') : 10, frozenset('b') : 20, frozenset('ab') : 5}, ['a', 'b'])
+    monkeypatch.setattr('lisc.scrape._make_requester', lambda api_key: req)
+
+    asyncio.run(_scrape_counts_async([['a'], ['b']], [], [], [], 'pubmed', None, True))
+
+    assert capsys.readouterr().out.splitlines()[-1] == 'Finished 3 of 3 searches'
+
+def test_get_count():
+    """Test the _get_count function."""
+
+    req = StubCounter({frozenset('a') : 10}, ['a', 'b'])
+
+    assert asyncio.run(_get_count(req, 'esearch.fcgi?&term="a"')) == 10
+
+    with raises(ValueError) as err:
+        asyncio.run(_get_count(req, 'esearch.fcgi?&api_key=secret&term="b"'))
+    assert 'secret' not in str(err.value)
+
+def test_hide_key():
+    """Test the _hide_key function."""
+
+    assert _hide_key('esearch.fcgi?db=pubmed&api_key=secret&term="a"') == \
+        'esearch.fcgi?db=pubmed&term="a"'
+    assert _hide_key('esearch.fcgi?db=pubmed') == 'esearch.fcgi?db=pubmed'
@@ -2,7 +2,9 @@
 
 # Import custom code
 from lisc.base import Base
+from lisc.data import Data
 from lisc.scrape import scrape_words
+from lisc.cooccur import get_cooccur
 
 ################################################################################################
 #################################### LISC - WORDS - Classes ####################################
@@ -52,6 +54,44 @@ class Words(Base):
         return self.results[ind]
 
 
+    def get_cooccur(self, key, word2id, window=5, db=None):
+        """Count co-occurences of words in the abstracts found for a given term.
+
+        Parameters
+        ----------
+        key : str
+            Term name to get from results data.
+        word2id : dict
+            Mapping of each word in the vocabulary to an index, from 0 to the number of words.
+        window : int, optional (default: 5)
+            Maximum distance between words, in an abstract, to count as co-occuring.
+        db : SCDB() object, optional
+            Database to load the term data from, if it has been saved out and cleared.
+
+        Returns
+        -------
+        2d array
+            Number of co-occurences of each pair of words, with shape (n_words, n_words).
+
+        Raises
+        ------
+        ValueError
+            If there are no words available for the term.
+        """
+
+        dat = self[key]
+
+        # If the data has been saved out and cleared (as after a scrape), load a copy of it
+        if not dat.n_articles and 'Saved' in dat.history:
+            dat = Data(dat.label, dat.term)
+            dat.load(db)
+
+        if not dat.words_flat:
+            raise ValueError('No words available for term: ' + key)
+
+        return get_cooccur(dat.words, word2id, window)
+
+
     def add_results(self, new_result):
         """Add a new Data results object.
 
@@ -65,7 +105,8 @@ class Words(Base):
         self.results.append(new_result)
 
 
-    def run_scrape(self, db='pubmed', retmax=None, use_hist=False, save_n_clear=True, verbose=False):
+    def run_scrape(self, db='pubmed', retmax=None, use_hist=False, save_n_clear=True,
+                   api_key=None, verbose=False):
         """Launch a scrape of words data.
 
         Parameters
@@ -78,11 +119,14 @@ class Words(Base):
             Use e-utilities history: storing results on their server, as needed.
         save_n_clear : bool, optional (default: False)
             Whether to
+        api_key : str, optional
+            An NCBI API key. If provided, requests are sent at a higher rate.
         verbose : bool, optional (default: False)
             Whether to print out updates.
         """
 
         self.results, self.meta_dat = scrape_words(self.terms, self.exclusions, db=db,
                                                    retmax=retmax, use_hist=use_hist,
-                                                   save_n_clear=save_n_clear, verbose=verbose)
+                                                   save_n_clear=save_n_clear, api_key=api_key,
+                                                   verbose=verbose)
         self.result_keys = [dat.label for dat in self.results]